@@ -0,0 +1,29 @@
+import streamlit as st
+import http.cookiejar
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeout in seconds for backend calls
+REQUEST_TIMEOUT = (3, 30)
+
+@st.cache_resource
+def get_session(connect_retries=2):
+    """Return a pooled requests.Session shared across reruns and users.
+
+    Keeping the session alive lets calls reuse open TCP/TLS connections
+    instead of paying a fresh handshake on every Streamlit rerun. Only failed
+    connection attempts are retried; read timeouts are raised straight away
+    as requests.Timeout so a hung backend is not hit again.
+    """
+    session = requests.Session()
+    # The session is shared by every user of the process, so never keep cookies
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=connect_retries, connect=connect_retries, read=False, backoff_factor=0.2)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -1,9 +1,11 @@
 import streamlit as st
 from dotenv import load_dotenv
 import os
+from http_session import get_session
 
 load_dotenv()
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8080")
+LOGIN_TIMEOUT = (3, 10) # (connect, read) seconds, so a hung backend fails fast
 
 st.set_page_config(
     page_title="Analytics Dashboard",
@@ -32,9 +34,11 @@ if not st.session_state["access_token"]:
         if submitted:
             import requests
             try:
-                response = requests.post(
+                # No connect retries, so a dead backend fails on the first attempt
+                response = get_session(connect_retries=0).post(
                     f"{BASE_URL}/login",
-                    json={"username": username, "password": password}
+                    json={"username": username, "password": password},
+                    timeout=LOGIN_TIMEOUT
                 )
                 
                 if response.status_code == 200:
@@ -45,6 +49,8 @@ if not st.session_state["access_token"]:
                     st.rerun()
                 else:
                     st.error("Invalid credentials")
+            except requests.Timeout:
+                st.error("The server is taking too long to respond. Please try again.")
             except requests.RequestException as e:
                 st.error(f"Connection error: {e}")
     
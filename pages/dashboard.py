@@ -1,13 +1,16 @@
 import streamlit as st
 import requests
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import threading
+import time
+import functools
 from datetime import datetime, timedelta, date # Import date
 import os
 from dotenv import load_dotenv
-import json
+import orjson
 import logging # Use logging module
+from http_session import get_session, REQUEST_TIMEOUT
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,6 +20,10 @@ BASE_URL = os.getenv("BASE_URL", "http://localhost:8080")
 
 # --- Configuration ---
 DEFAULT_DAYS_RANGE = 90 # Default to 90 days back
+CACHE_TTL_SECONDS = 300 # How long dashboard API responses are reused
+MAX_ACTIVITY_POINTS = 500 # Daily points per series shown before switching to weekly totals
+ETAG_STORE_MAX_ENTRIES = 64 # Responses kept for conditional GETs
+ETAG_STORE_MAX_AGE_SECONDS = 3600 # Stored responses older than this are dropped
 
 # --- Helper Functions ---
 def safe_get(data, key, default=0):
@@ -29,6 +36,7 @@ def safe_get(data, key, default=0):
     except (ValueError, TypeError):
         return default
 
+@functools.lru_cache(maxsize=64) # Same start/end dates are formatted several times per rerun
 def format_date_for_display(dt):
     """Format datetime object for display."""
     if isinstance(dt, datetime):
@@ -37,6 +45,244 @@ def format_date_for_display(dt):
         return dt.strftime("%d %b %Y")
     return str(dt)
 
+class DashboardAPIError(Exception):
+    """Raised when a dashboard endpoint returns an unusable response."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class ETagStore:
+    """Bounded, thread-safe LRU of the last (ETag, body) seen per request.
+
+    Entries older than `max_age` seconds are dropped on lookup, and the least
+    recently used entry is evicted once `max_entries` is exceeded, so bodies
+    for old tokens and date ranges do not accumulate.
+    """
+
+    def __init__(self, max_entries, max_age):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._max_age = max_age
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self._max_age:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def put(self, key, etag, body):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+@st.cache_resource
+def get_etag_store():
+    """Return the ETag store shared across reruns.
+
+    Kept in a cache resource rather than st.session_state because the fetchers
+    run in worker threads, where session state is not available.
+    """
+    return ETagStore(ETAG_STORE_MAX_ENTRIES, ETAG_STORE_MAX_AGE_SECONDS)
+
+def get_json(path, token, params, label):
+    """GET a dashboard endpoint and return the parsed JSON body.
+
+    Sends If-None-Match when an ETag is known for this request and reuses the
+    stored body on a 304, skipping the payload transfer and parse.
+    """
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+        "Accept-Encoding": "gzip, br" # Decompressed transparently by urllib3
+    }
+    etag_store = get_etag_store()
+    etag_key = (path, token, tuple(sorted(params.items())))
+    cached = etag_store.get(etag_key)
+    if cached:
+        headers["If-None-Match"] = cached[0]
+    logging.info(f"Fetching {label} from {BASE_URL}{path} with params: {params}")
+    response = get_session().get(
+        f"{BASE_URL}{path}",
+        headers=headers,
+        params=params,
+        timeout=REQUEST_TIMEOUT
+    )
+    logging.info(f"{label.capitalize()} Response Status: {response.status_code}")
+
+    if response.status_code == 304 and cached:
+        logging.info(f"{label.capitalize()} not modified, reusing stored response")
+        return cached[1]
+    if response.status_code != 200:
+        raise DashboardAPIError(f"Error fetching {label}: {response.status_code} - {response.text}", response.status_code)
+    try:
+        data = orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        raise DashboardAPIError(f"Failed to parse {label} JSON response: {e}\nRaw response: {response.text}")
+    logging.info(f"Parsed {label}: {data}")
+    if response.headers.get("ETag"):
+        etag_store.put(etag_key, response.headers["ETag"], data)
+    return data
+
+@st.cache_resource
+def get_missing_endpoints():
+    """Return the optional endpoints this backend has answered 404 for.
+
+    Shared by the whole process, so each optional endpoint is probed at most
+    once per server start instead of once per token, date range and TTL.
+    """
+    return set()
+
+def get_optional_json(path, token, params, label):
+    """Like `get_json`, but return None if the backend does not have `path`."""
+    missing_endpoints = get_missing_endpoints()
+    if path in missing_endpoints:
+        return None
+    try:
+        return get_json(path, token, params, label)
+    except DashboardAPIError as e:
+        if e.status_code != 404:
+            raise
+    logging.info(f"{path} not available on this backend, skipping it until restart")
+    missing_endpoints.add(path)
+    return None
+
+# Cached per token and date params so Streamlit reruns reuse the last response.
+# Errors are raised rather than returned so failed calls are never cached.
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def fetch_stats(token, start_iso, end_iso):
+    """Fetch dashboard statistics for a date range."""
+    return get_json("/dashboard/stats", token, {"start_date": start_iso, "end_date": end_iso}, "statistics")
+
+def widen_activity(activity):
+    """Join legacy daily_uploads/daily_analyses arrays into wide per-day rows."""
+    rows = {}
+    for item in activity.get("daily_uploads", []):
+        rows.setdefault(item["_id"], {"date": item["_id"], "uploads": 0, "analyses": 0})["uploads"] = item.get("uploads", 0)
+    for item in activity.get("daily_analyses", []):
+        rows.setdefault(item["_id"], {"date": item["_id"], "uploads": 0, "analyses": 0})["analyses"] = item.get("analyses", 0)
+    return sorted(rows.values(), key=lambda row: row["date"])
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def fetch_activity(token, days):
+    """Fetch daily user activity for the last `days` days.
+
+    Returns `[{"date": ..., "uploads": ..., "analyses": ...}, ...]`, already
+    joined and zero-filled by the backend. Backends without the wide endpoint
+    fall back to the legacy one, joined here once per cache entry.
+    """
+    rows = get_optional_json("/dashboard/user_activity_wide", token, {"days": days}, "activity data")
+    if rows is not None:
+        return rows
+    return widen_activity(get_json("/dashboard/user_activity", token, {"days": days}, "activity data"))
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def fetch_bundle(token, start_iso, end_iso):
+    """Fetch stats and daily activity for a date range in a single request.
+
+    Returns `{"stats": {...}, "activity": [...]}` with activity in the same wide
+    row format as `fetch_activity` (a legacy daily_uploads/daily_analyses
+    object is joined here), or None when the backend has no bundle endpoint.
+    """
+    bundle = get_optional_json("/dashboard/bundle", token, {"start_date": start_iso, "end_date": end_iso}, "dashboard data")
+    if bundle is None:
+        return None
+    missing_keys = [key for key in ("stats", "activity") if key not in bundle]
+    if missing_keys:
+        raise DashboardAPIError(f"Dashboard data response is missing {', '.join(missing_keys)}: {bundle}")
+    activity = bundle["activity"]
+    if isinstance(activity, dict):
+        activity = widen_activity(activity)
+    return {"stats": bundle["stats"], "activity": activity}
+
+def resolve_fetch(fetch, *args):
+    """Call `fetch(*args)` and return (data, error_message)."""
+    try:
+        return fetch(*args), None
+    except DashboardAPIError as e:
+        return None, str(e)
+    except requests.Timeout:
+        return None, f"Error: Request timed out connecting to the server at {BASE_URL}."
+    except requests.RequestException as e:
+        return None, f"Error connecting to server: {e}. Please check if the server is running at {BASE_URL}."
+
+# --- Chart Builders ---
+# Cached on the payload they are built from, so reruns with unchanged data
+# re-display the stored figure instead of rebuilding it. pandas and plotly are
+# imported lazily so they are only loaded once a chart is actually drawn, and
+# the distribution charts take plain lists so they skip pandas altogether.
+def distribution_to_arrays(distribution, missing_label):
+    """Split `[{"_id": ..., "count": ...}]` into parallel name/value lists."""
+    # Replace None _id with missing_label
+    names = [item["_id"] if item["_id"] is not None else missing_label for item in distribution]
+    values = [item["count"] for item in distribution]
+    return names, values
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def build_body_part_fig(body_part_distribution, total_analyses):
+    """Build the body part pie chart."""
+    import plotly.express as px
+
+    names, values = distribution_to_arrays(body_part_distribution, "Not Specified")
+    fig = px.pie(values=values, names=names,
+               title=f"Distribution for {total_analyses} Analyses", hole=0.3)
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def build_risk_fig(risk_distribution, total_analyses):
+    """Build the risk level bar chart."""
+    import plotly.express as px
+
+    names, values = distribution_to_arrays(risk_distribution, "Unknown")
+    # Define colors for risk levels
+    color_map = {'benign': 'green', 'malignant': 'red', 'other': 'orange', 'unknown': 'grey', 'no se puede clasificar': 'purple', 'Unknown': 'grey'}
+    return px.bar(x=names, y=values,
+               title=f"Distribution for {total_analyses} Analyses",
+               labels={"x": "Risk Classification", "y": "Number of Analyses", "color": "Risk Classification"},
+               color=names, # Color bars by classification
+               color_discrete_map=color_map)
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def build_activity_fig(activity_data, start_date, end_date):
+    """Build the daily activity line chart from wide per-day rows."""
+    import pandas as pd
+    import plotly.express as px
+
+    activity_df = pd.DataFrame(activity_data, columns=["date", "uploads", "analyses"])
+    activity_df["date"] = pd.to_datetime(activity_df["date"])
+    # Wide date ranges are summed per week so fewer points are sent to the browser
+    weekly = len(activity_df) > MAX_ACTIVITY_POINTS
+    if weekly:
+        activity_df = activity_df.resample("W", on="date").sum().reset_index()
+
+    # Long format lets a single px.line call build both series
+    long_df = activity_df.rename(
+        columns={"uploads": "Image Uploads", "analyses": "Analyses Performed"}
+    ).melt(
+        id_vars="date",
+        value_vars=["Image Uploads", "Analyses Performed"],
+        var_name="series",
+        value_name="count"
+    )
+    fig = px.line(long_df, x="date", y="count", color="series", markers=True,
+                  labels={"series": "Activity"})
+    fig.update_layout(
+        title=f"{'Weekly' if weekly else 'Daily'} Activity ({format_date_for_display(start_date)} - {format_date_for_display(end_date)})",
+        xaxis_title="Week" if weekly else "Date",
+        yaxis_title="Count",
+        hovermode="x unified"
+    )
+    return fig
+
 # --- Main App ---
 st.set_page_config(page_title="Melanoma Analytics", layout="wide")
 
@@ -75,79 +321,115 @@ else:
 
 
 # --- Fetch Data ---
-stats = None
-activity_data = None
-error_message = None
-
-try:
-    headers = {
-        "Authorization": f"Bearer {st.session_state['access_token']}",
-        "Content-Type": "application/json"
-    }
-    # Convert date objects to ISO strings for the API call
-    params_stats = {
-        "start_date": start_date.isoformat(),
-        "end_date": end_date.isoformat()
-    }
-    params_activity = {
-        "days": (end_date - start_date).days + 1 # Include end day
-    }
-
-    # Fetch stats data
-    logging.info(f"Fetching stats from {BASE_URL}/dashboard/stats with params: {params_stats}")
-    response_stats = requests.get(
-        f"{BASE_URL}/dashboard/stats",
-        headers=headers,
-        params=params_stats,
-        timeout=30 # Add timeout
-    )
-    logging.info(f"Stats Response Status: {response_stats.status_code}")
+token = st.session_state["access_token"]
+# Convert date objects to ISO strings for the API call
+start_iso = start_date.isoformat()
+end_iso = end_date.isoformat()
+days = (end_date - start_date).days + 1 # Include end day
+
+# Prefer one bundled request; cache hits return immediately
+bundle, bundle_error = resolve_fetch(fetch_bundle, token, start_iso, end_iso)
+if bundle is not None:
+    stats, activity_data = bundle["stats"], bundle["activity"]
+    errors = []
+elif bundle_error:
+    stats, activity_data = None, None
+    errors = [bundle_error]
+else:
+    # No bundle endpoint on this backend; fetch both endpoints concurrently instead
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        future_stats = executor.submit(fetch_stats, token, start_iso, end_iso)
+        future_activity = executor.submit(fetch_activity, token, days)
+
+    stats, stats_error = resolve_fetch(future_stats.result)
+    activity_data, activity_error = resolve_fetch(future_activity.result)
+    errors = [error for error in (stats_error, activity_error) if error]
+
+for error in errors:
+    logging.error(error)
+error_message = "\n".join(errors) if errors else None
+
+
+# --- Tab Renderers ---
+# Fragments rerun on their own, so widgets inside one tab do not rerun the
+# fetches or rebuild the charts of the other tabs.
+@st.fragment
+def render_overview(stats, start_date, end_date):
+    """Render the KPIs and distribution charts of the Overview tab."""
+    # Display raw data for debugging under an expander
+    with st.expander("Show Raw Server Response (Stats)"):
+        st.json(stats)
+
+    # Display KPIs
+    col1, col2, col3, col4 = st.columns(4)
+    total_users = safe_get(stats, "total_users", "N/A")
+    total_images = safe_get(stats, "total_images", 0)
+    total_analyses = safe_get(stats, "total_analyses", 0)
+
+    with col1:
+        # Label is already correct
+        st.metric("Total Users (System)", total_users)
+    with col2:
+        # Update label
+        st.metric("Total Images (System, Period)", total_images)
+    with col3:
+        # Update label
+        st.metric("Total Analyses (System, Period)", total_analyses)
+    with col4:
+        analysis_rate = (total_analyses / total_images * 100) if total_images > 0 else 0
+        # Update label
+        st.metric("Analysis Rate (System, Period)", f"{analysis_rate:.1f}%")
+
+
+    # Nothing to chart for an empty range, so skip building the figures entirely
+    if total_analyses == 0:
+        st.info(f"No analyses found between {format_date_for_display(start_date)} and {format_date_for_display(end_date)}.")
+        return
+
+    # Charts
+    col_chart1, col_chart2 = st.columns(2)
+
+    with col_chart1:
+        st.subheader("Analyses by Body Part")
+        body_part_distribution = stats.get("body_part_distribution", [])
+        if body_part_distribution:
+            try:
+                fig = build_body_part_fig(body_part_distribution, total_analyses)
+                st.plotly_chart(fig, use_container_width=True)
+            except Exception as e:
+                st.warning(f"Could not display body part chart: {e}")
+        else:
+            st.info("Body part data not available for the analyses in this period.")
+
+    with col_chart2:
+        st.subheader("Analyses by Risk Level")
+        risk_distribution = stats.get("risk_distribution", [])
+        if risk_distribution:
+            try:
+                fig = build_risk_fig(risk_distribution, total_analyses)
+                st.plotly_chart(fig, use_container_width=True)
+            except Exception as e:
+                st.warning(f"Could not display risk chart: {e}")
+        else:
+            st.info("Risk classification data not available for the analyses in this period.")
 
-    # Fetch activity data
-    logging.info(f"Fetching activity from {BASE_URL}/dashboard/user_activity with params: {params_activity}")
-    response_activity = requests.get(
-        f"{BASE_URL}/dashboard/user_activity",
-        headers=headers,
-        params=params_activity,
-        timeout=30 # Add timeout
-    )
-    logging.info(f"Activity Response Status: {response_activity.status_code}")
 
-    # Process Stats Response
-    if response_stats.status_code == 200:
-        try:
-            stats = response_stats.json()
-            logging.info(f"Parsed stats data: {stats}")
-        except json.JSONDecodeError as e:
-            error_message = f"Failed to parse statistics JSON response: {e}\nRaw response: {response_stats.text}"
-            logging.error(error_message)
-    else:
-        error_message = f"Error fetching statistics: {response_stats.status_code} - {response_stats.text}"
-        logging.error(error_message)
+@st.fragment
+def render_activity(activity_data, start_date, end_date):
+    """Render the daily activity chart of the User Activity tab."""
+    # Display the per-day rows the chart is built from (possibly joined client-side) for debugging
+    with st.expander("Show Daily Activity Rows"):
+        st.json(activity_data)
 
-    # Process Activity Response
-    if response_activity.status_code == 200:
+    if activity_data:
         try:
-            activity_data = response_activity.json()
-            logging.info(f"Parsed activity data: {activity_data}")
-        except json.JSONDecodeError as e:
-            # Append to existing error message if any
-            activity_error = f"Failed to parse activity JSON response: {e}\nRaw response: {response_activity.text}"
-            error_message = f"{error_message}\n{activity_error}" if error_message else activity_error
-            logging.error(activity_error)
+            fig = build_activity_fig(activity_data, start_date, end_date)
+            st.plotly_chart(fig, use_container_width=True)
+        except Exception as e:
+            st.warning(f"Could not display activity chart: {e}")
+            logging.error(f"Error processing activity data: {e}")
     else:
-        # Append to existing error message if any
-        activity_error = f"Error fetching activity data: {response_activity.status_code} - {response_activity.text}"
-        error_message = f"{error_message}\n{activity_error}" if error_message else activity_error
-        logging.error(activity_error)
-
-
-except requests.Timeout:
-    error_message = f"Error: Request timed out connecting to the server at {BASE_URL}."
-    logging.error(error_message)
-except requests.RequestException as e:
-    error_message = f"Error connecting to server: {e}. Please check if the server is running at {BASE_URL}."
-    logging.error(error_message)
+        st.info(f"No user activity data found between {format_date_for_display(start_date)} and {format_date_for_display(end_date)}.")
 
 
 # --- Display Data ---
@@ -162,77 +444,7 @@ if error_message:
 with tab1:
     st.header("Overview")
     if stats:
-        # Display raw data for debugging under an expander
-        with st.expander("Show Raw Server Response (Stats)"):
-            st.json(stats)
-
-        # Display KPIs
-        col1, col2, col3, col4 = st.columns(4)
-        total_users = safe_get(stats, "total_users", "N/A")
-        total_images = safe_get(stats, "total_images", 0)
-        total_analyses = safe_get(stats, "total_analyses", 0)
-
-        with col1:
-            # Label is already correct
-            st.metric("Total Users (System)", total_users)
-        with col2:
-            # Update label
-            st.metric("Total Images (System, Period)", total_images)
-        with col3:
-            # Update label
-            st.metric("Total Analyses (System, Period)", total_analyses)
-        with col4:
-            analysis_rate = (total_analyses / total_images * 100) if total_images > 0 else 0
-            # Update label
-            st.metric("Analysis Rate (System, Period)", f"{analysis_rate:.1f}%")
-
-
-        # Charts
-        col_chart1, col_chart2 = st.columns(2)
-
-        with col_chart1:
-            st.subheader("Analyses by Body Part")
-            body_part_distribution = stats.get("body_part_distribution", [])
-            if body_part_distribution and total_analyses > 0:
-                try:
-                    # Replace None _id with 'Not Specified'
-                    for item in body_part_distribution:
-                        if item["_id"] is None: item["_id"] = "Not Specified"
-                    body_part_df = pd.DataFrame(body_part_distribution)
-                    fig = px.pie(body_part_df, values="count", names="_id",
-                               title=f"Distribution for {total_analyses} Analyses", hole=0.3)
-                    fig.update_traces(textposition='inside', textinfo='percent+label')
-                    st.plotly_chart(fig, use_container_width=True)
-                except Exception as e:
-                    st.warning(f"Could not display body part chart: {e}")
-            elif total_analyses > 0:
-                 st.info("Body part data not available for the analyses in this period.")
-            else:
-                st.info(f"No analyses found between {format_date_for_display(start_date)} and {format_date_for_display(end_date)}.")
-
-        with col_chart2:
-            st.subheader("Analyses by Risk Level")
-            risk_distribution = stats.get("risk_distribution", [])
-            if risk_distribution and total_analyses > 0:
-                try:
-                     # Replace None _id with 'Unknown'
-                    for item in risk_distribution:
-                        if item["_id"] is None: item["_id"] = "Unknown"
-                    risk_df = pd.DataFrame(risk_distribution)
-                    # Define colors for risk levels
-                    color_map = {'benign': 'green', 'malignant': 'red', 'other': 'orange', 'unknown': 'grey', 'no se puede clasificar': 'purple', 'Unknown': 'grey'}
-                    fig = px.bar(risk_df, x="_id", y="count",
-                               title=f"Distribution for {total_analyses} Analyses",
-                               labels={"_id": "Risk Classification", "count": "Number of Analyses"},
-                               color="_id", # Color bars by classification
-                               color_discrete_map=color_map)
-                    st.plotly_chart(fig, use_container_width=True)
-                except Exception as e:
-                    st.warning(f"Could not display risk chart: {e}")
-            elif total_analyses > 0:
-                 st.info("Risk classification data not available for the analyses in this period.")
-            else:
-                st.info(f"No analyses found between {format_date_for_display(start_date)} and {format_date_for_display(end_date)}.")
+        render_overview(stats, start_date, end_date)
     elif not error_message:
         st.info("Waiting for statistics data...")
     # If there was an error, the message is displayed above the tabs
@@ -240,66 +452,8 @@ with tab1:
 
 with tab2:
     st.header("User Activity")
-    if activity_data:
-         # Display raw data for debugging under an expander
-        with st.expander("Show Raw Server Response (Activity)"):
-            st.json(activity_data)
-
-        daily_uploads = activity_data.get("daily_uploads", [])
-        daily_analyses = activity_data.get("daily_analyses", [])
-
-        # Convert to dataframes and handle potential missing keys/dates
-        try:
-            uploads_df = pd.DataFrame(daily_uploads) if daily_uploads else pd.DataFrame(columns=['_id', 'uploads'])
-            analyses_df = pd.DataFrame(daily_analyses) if daily_analyses else pd.DataFrame(columns=['_id', 'analyses'])
-
-            # Ensure date column is datetime
-            if not uploads_df.empty: uploads_df['_id'] = pd.to_datetime(uploads_df['_id'])
-            if not analyses_df.empty: analyses_df['_id'] = pd.to_datetime(analyses_df['_id'])
-
-            # Merge dataframes on date for combined chart
-            if not uploads_df.empty and not analyses_df.empty:
-                 activity_df = pd.merge(uploads_df, analyses_df, on='_id', how='outer').fillna(0).sort_values('_id')
-            elif not uploads_df.empty:
-                 activity_df = uploads_df.rename(columns={'_id': 'date', 'uploads': 'Uploads'}).sort_values('date')
-                 activity_df['Analyses'] = 0
-            elif not analyses_df.empty:
-                 activity_df = analyses_df.rename(columns={'_id': 'date', 'analyses': 'Analyses'}).sort_values('date')
-                 activity_df['Uploads'] = 0
-            else:
-                 activity_df = pd.DataFrame(columns=['date', 'Uploads', 'Analyses'])
-
-
-            if not activity_df.empty:
-                fig = go.Figure()
-                if 'Uploads' in activity_df.columns:
-                     fig.add_trace(go.Scatter(
-                        x=activity_df["date"],
-                        y=activity_df["Uploads"],
-                        name="Image Uploads",
-                        mode="lines+markers"
-                    ))
-                if 'Analyses' in activity_df.columns:
-                    fig.add_trace(go.Scatter(
-                        x=activity_df["date"],
-                        y=activity_df["Analyses"],
-                        name="Analyses Performed",
-                        mode="lines+markers"
-                    ))
-                fig.update_layout(
-                    title=f"Daily Activity ({format_date_for_display(start_date)} - {format_date_for_display(end_date)})",
-                    xaxis_title="Date",
-                    yaxis_title="Count",
-                    hovermode="x unified"
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info(f"No user activity data found between {format_date_for_display(start_date)} and {format_date_for_display(end_date)}.")
-
-        except Exception as e:
-            st.warning(f"Could not display activity chart: {e}")
-            logging.error(f"Error processing activity data: {e}")
-
+    if activity_data is not None:
+        render_activity(activity_data, start_date, end_date)
     elif not error_message:
         st.info("Waiting for activity data...")
      # If there was an error, the message is displayed above the tabs